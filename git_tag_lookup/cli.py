@@ -4,7 +4,7 @@ import argparse
 import sys
 
 from .core import GitTagLookupError, find_earliest_tag_for_commit, search_commits_by_keyword
-from .utils import format_json_output
+from .utils import write_json_output
 
 
 def main():
@@ -43,28 +43,34 @@ Examples:
         help="Limit the number of results. For --commit: number of earliest tags to return (default: 1). For --key: number of commits to return.",
     )
 
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Update the cached clone of a remote repository even if it is recent (--commit only)",
+    )
+
     args = parser.parse_args()
 
     try:
         if args.commit:
             # Function 1: Find earliest tag(s) for commit
             limit = args.limit if args.limit is not None else 1
-            result = find_earliest_tag_for_commit(args.repo, args.commit, limit)
-            print(format_json_output(result))
+            result = find_earliest_tag_for_commit(args.repo, args.commit, limit, args.refresh)
+            write_json_output(result, sys.stdout)
 
         elif args.keyword:
             # Function 2: Search commits by keyword
             limit = args.limit if args.limit is not None else None
             result = search_commits_by_keyword(args.repo, args.keyword, limit)
-            print(format_json_output(result))
+            write_json_output(result, sys.stdout)
 
     except GitTagLookupError as e:
         error_result = {"error": str(e)}
-        print(format_json_output(error_result), file=sys.stderr)
+        write_json_output(error_result, sys.stderr)
         sys.exit(1)
     except Exception as e:
         error_result = {"error": f"Unexpected error: {str(e)}"}
-        print(format_json_output(error_result), file=sys.stderr)
+        write_json_output(error_result, sys.stderr)
         sys.exit(1)
 
 
@@ -1,10 +1,16 @@
 """Core functionality for git-tag-lookup."""
 
+import hashlib
 import os
 import shutil
 import subprocess
+import sys
 import tempfile
-from typing import Dict, List, Optional
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 
 from .utils import is_git_url, is_local_directory
 
@@ -15,6 +21,94 @@ class GitTagLookupError(Exception):
     pass
 
 
+# Cached clones of remote repositories younger than this are used without fetching
+CACHE_TTL_SECONDS = 300
+
+# Worker threads for fallback paths that run one git process per tag. The threads
+# mostly wait on subprocesses, so more workers than CPUs pays off.
+MAX_GIT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+class GitBatch:
+    """A long-lived `git cat-file --batch-check` process for resolving object names.
+
+    Use as a context manager so the process is cleaned up:
+
+        with GitBatch(repo_path) as batch:
+            sha = batch.resolve("v1.0.0^{commit}")
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._proc: Optional[subprocess.Popen] = None
+
+    def __enter__(self) -> "GitBatch":
+        try:
+            self._proc = subprocess.Popen(
+                [
+                    "git",
+                    "cat-file",
+                    "--batch-check=%(objectname) %(objecttype) %(objectsize)",
+                ],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                encoding="utf-8",
+                errors="surrogateescape",
+                bufsize=1,
+            )
+        except FileNotFoundError:
+            raise GitTagLookupError("git command not found. Please install git.")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Terminate the underlying git process."""
+        if self._proc is None:
+            return
+        proc, self._proc = self._proc, None
+        try:
+            if proc.stdin:
+                proc.stdin.close()
+            proc.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        finally:
+            if proc.stdout:
+                proc.stdout.close()
+
+    def query(self, rev: str) -> Optional[Tuple[str, str, int]]:
+        """Look up a revision, return (objectname, objecttype, objectsize) or None if missing."""
+        if self._proc is None or self._proc.stdin is None or self._proc.stdout is None:
+            raise GitTagLookupError("GitBatch used outside of its context")
+        try:
+            self._proc.stdin.write(rev + "\n")
+            self._proc.stdin.flush()
+            line = self._proc.stdout.readline()
+        except (OSError, ValueError):
+            raise GitTagLookupError(f"git cat-file exited unexpectedly in {self.repo_path}")
+        if not line:
+            raise GitTagLookupError(f"git cat-file exited unexpectedly in {self.repo_path}")
+
+        parts = line.split()
+        # Missing or ambiguous names are reported as "<name> missing" / "<name> ambiguous"
+        if len(parts) != 3:
+            return None
+        try:
+            return parts[0], parts[1], int(parts[2])
+        except ValueError:
+            return None
+
+    def resolve(self, rev: str) -> Optional[str]:
+        """Resolve a revision to its full object name, or None if it does not exist."""
+        info = self.query(rev)
+        return info[0] if info else None
+
+
 def get_tags_from_remote(repo_url: str) -> List[str]:
     """Get all tags from a remote git repository."""
     try:
@@ -44,18 +138,186 @@ def get_tags_from_remote(repo_url: str) -> List[str]:
         raise GitTagLookupError("git command not found. Please install git.")
 
 
+def _user_cache_dir() -> str:
+    """Return the per-user cache directory of git-tag-lookup for this platform."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "git-tag-lookup")
+
+
+def _cache_dir(repo_url: str) -> str:
+    """Return the cache directory for the clone of a remote repository."""
+    return os.path.join(_user_cache_dir(), hashlib.sha1(repo_url.encode("utf-8")).hexdigest())
+
+
+def _write_commit_graph(repo_path: str) -> None:
+    """Write or extend the commit-graph of a repository.
+
+    With a commit-graph git uses generation numbers to cut reachability walks short,
+    which makes `git tag --contains` and `merge-base --is-ancestor` much faster.
+    This is only an optimization, so failures are ignored.
+    """
+    try:
+        subprocess.run(
+            ["git", "commit-graph", "write", "--reachable", "--split"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            timeout=300,
+        )
+    except (subprocess.TimeoutExpired, FileNotFoundError):
+        pass
+
+
+def _is_valid_clone(repo_path: str) -> bool:
+    """Check that a cached clone is still a readable git repository of its own."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--absolute-git-dir"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return False
+    if result.returncode != 0:
+        return False
+    # Compare paths, so a broken clone does not pass by resolving to a parent repository
+    return os.path.realpath(result.stdout.strip()) == os.path.realpath(repo_path)
+
+
+def get_cached_clone(repo_url: str, refresh: bool = False) -> Tuple[str, bool]:
+    """Return the path of an up-to-date bare clone of a remote repository.
+
+    The clone is kept in the user cache directory and reused across runs. An existing
+    clone is updated with an incremental fetch of branches and tags when it is older than
+    CACHE_TTL_SECONDS, or always when refresh is True. The clone's commit-graph is
+    kept up to date so that reachability queries stay fast. If the fetch fails, for
+    example because the remote is unreachable, the existing clone is used as is; it is
+    only replaced when it is no longer a valid repository.
+
+    Returns a (path, updated) tuple, where updated is False when the clone was reused
+    within CACHE_TTL_SECONDS without contacting the remote.
+    """
+    cache_path = _cache_dir(repo_url)
+
+    try:
+        if os.path.isdir(cache_path):
+            last_update = os.path.getmtime(cache_path)
+            if not refresh and time.time() - last_update < CACHE_TTL_SECONDS:
+                return cache_path, False
+            try:
+                subprocess.run(
+                    [
+                        "git",
+                        "fetch",
+                        "--filter=blob:none",
+                        "--prune",
+                        "--force",
+                        "origin",
+                        "+refs/heads/*:refs/heads/*",
+                        "+refs/tags/*:refs/tags/*",
+                    ],
+                    cwd=cache_path,
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=300,
+                )
+            except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+                if _is_valid_clone(cache_path):
+                    # A failed fetch can still touch the directory, restore the mtime so
+                    # the next run tries to update again
+                    os.utime(cache_path, (last_update, last_update))
+                    warnings.warn(
+                        f"Failed to update the cached clone of {repo_url}, using it as is",
+                        stacklevel=2,
+                    )
+                    return cache_path, True
+                # The cached clone is broken, start over with a fresh one
+                shutil.rmtree(cache_path, ignore_errors=True)
+            else:
+                _write_commit_graph(cache_path)
+                os.utime(cache_path)
+                return cache_path, True
+
+        # Clone next to the final location and move it into place, so an interrupted
+        # clone never leaves a broken cache behind
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_dir = tempfile.mkdtemp(dir=os.path.dirname(cache_path))
+        try:
+            # Bare blobless clone: tag and ancestry queries only need commits and refs.
+            # Not shallow, since a truncated history hides older commits from the tags.
+            subprocess.run(
+                ["git", "clone", "--bare", "--filter=blob:none", "--tags", repo_url, temp_dir],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=300,
+            )
+            _write_commit_graph(temp_dir)
+            try:
+                os.rename(temp_dir, cache_path)
+            except OSError:
+                # Another process populated the cache first
+                if not os.path.isdir(cache_path):
+                    raise
+        finally:
+            if os.path.exists(temp_dir):
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        return cache_path, True
+    except subprocess.TimeoutExpired:
+        raise GitTagLookupError(f"Timeout while cloning {repo_url}")
+    except subprocess.CalledProcessError as e:
+        raise GitTagLookupError(f"Failed to clone {repo_url}: {e.stderr}")
+    except FileNotFoundError:
+        raise GitTagLookupError("git command not found. Please install git.")
+    except OSError as e:
+        raise GitTagLookupError(f"Failed to update cache for {repo_url}: {e}")
+
+
+def resolve_commit(repo_path: str, commit: str) -> Optional[str]:
+    """Resolve a commit-ish to its full commit hash, or None if it does not exist."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--verify", "--quiet", f"{commit}^{{commit}}"],
+            cwd=repo_path,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except subprocess.TimeoutExpired:
+        raise GitTagLookupError(f"Timeout while resolving commit {commit} in {repo_path}")
+    except FileNotFoundError:
+        raise GitTagLookupError("git command not found. Please install git.")
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
 def get_tags_from_local(repo_path: str) -> List[str]:
     """Get all tags from a local git repository."""
     try:
         result = subprocess.run(
-            ["git", "tag"], cwd=repo_path, capture_output=True, text=True, check=True, timeout=10
+            ["git", "tag"], cwd=repo_path, capture_output=True, check=True, timeout=10
         )
-        tags = [tag.strip() for tag in result.stdout.strip().split("\n") if tag.strip()]
+        # surrogateescape keeps tag names that are not valid UTF-8 usable as git arguments
+        tags = [
+            tag.decode("utf-8", "surrogateescape")
+            for tag in (line.strip() for line in result.stdout.splitlines())
+            if tag
+        ]
         return tags
     except subprocess.TimeoutExpired:
         raise GitTagLookupError(f"Timeout while fetching tags from {repo_path}")
     except subprocess.CalledProcessError as e:
-        raise GitTagLookupError(f"Failed to fetch tags from {repo_path}: {e.stderr}")
+        stderr = e.stderr.decode("utf-8", "replace")
+        raise GitTagLookupError(f"Failed to fetch tags from {repo_path}: {stderr}")
     except FileNotFoundError:
         raise GitTagLookupError("git command not found. Please install git.")
 
@@ -68,7 +330,6 @@ def check_commit_in_tag_local(repo_path: str, commit: str, tag: str) -> bool:
             ["git", "merge-base", "--is-ancestor", commit, tag],
             cwd=repo_path,
             capture_output=True,
-            text=True,
             timeout=10,
         )
         return result.returncode == 0
@@ -79,11 +340,12 @@ def check_commit_in_tag_local(repo_path: str, commit: str, tag: str) -> bool:
                 ["git", "tag", "--contains", commit],
                 cwd=repo_path,
                 capture_output=True,
-                text=True,
                 check=True,
                 timeout=10,
             )
-            tags = [t.strip() for t in result.stdout.strip().split("\n") if t.strip()]
+            tags = [
+                t.strip().decode("utf-8", "surrogateescape") for t in result.stdout.splitlines()
+            ]
             return tag in tags
         except subprocess.CalledProcessError:
             return False
@@ -91,6 +353,56 @@ def check_commit_in_tag_local(repo_path: str, commit: str, tag: str) -> bool:
         return False
 
 
+def get_tags_containing_commit(repo_path: str, commit: str, tags: List[str]) -> List[str]:
+    """Return the subset of tags that contain the given commit, preserving order.
+
+    Uses a single `git tag --contains` call and falls back to checking
+    each tagged commit individually if that fails. A timeout is an error rather
+    than a reason to fall back, since the per-tag checks would be slower still.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "tag", "--contains", commit],
+            cwd=repo_path,
+            capture_output=True,
+            check=True,
+            timeout=30,
+        )
+    except subprocess.TimeoutExpired:
+        raise GitTagLookupError(f"Timeout while finding tags containing {commit} in {repo_path}")
+    except subprocess.CalledProcessError:
+        return _get_tags_containing_commit_by_ancestry(repo_path, commit, tags)
+
+    # Decoded like get_tags_from_local, so the names compare equal
+    contained = {
+        t.decode("utf-8", "surrogateescape")
+        for t in (line.strip() for line in result.stdout.splitlines())
+        if t
+    }
+    return [tag for tag in tags if tag in contained]
+
+
+def _get_tags_containing_commit_by_ancestry(
+    repo_path: str, commit: str, tags: List[str]
+) -> List[str]:
+    """Check tags one by one, resolving them through a single cat-file process.
+
+    Tags pointing at the same commit share a single ancestry check, and the checks
+    run in parallel.
+    """
+    with GitBatch(repo_path) as batch:
+        tag_commits = [(tag, batch.resolve(f"refs/tags/{tag}^{{commit}}")) for tag in tags]
+
+    unique_commits = list({c for _, c in tag_commits if c is not None})
+    with ThreadPoolExecutor(max_workers=MAX_GIT_WORKERS) as executor:
+        results = executor.map(
+            lambda c: check_commit_in_tag_local(repo_path, commit, c), unique_commits
+        )
+        checked = dict(zip(unique_commits, results))
+
+    return [tag for tag, c in tag_commits if c is not None and checked[c]]
+
+
 def get_tag_timestamp(repo_path: str, tag: str) -> Optional[int]:
     """Get the timestamp of a tag (when it was created/committed).
 
@@ -131,6 +443,48 @@ def get_tag_timestamp(repo_path: str, tag: str) -> Optional[int]:
     return None
 
 
+def get_tag_timestamps(repo_path: str) -> Optional[Dict[str, int]]:
+    """Get the timestamps of all tags in a local repository with a single git call.
+
+    Uses the same timestamp as get_tag_timestamp: the commit date of the tagged
+    commit, falling back to the tag creation date. Returns a mapping of tag name
+    to Unix timestamp, or None if the refs could not be read.
+    """
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "for-each-ref",
+                "--format=%(refname)%09%(*committerdate:unix)%09%(committerdate:unix)"
+                "%09%(creatordate:unix)",
+                "refs/tags/",
+            ],
+            cwd=repo_path,
+            capture_output=True,
+            check=True,
+            timeout=30,
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+        return None
+
+    timestamps: Dict[str, int] = {}
+    for line in result.stdout.splitlines():
+        parts = line.split(b"\t")
+        if len(parts) != 4:
+            continue
+        tag = parts[0][len(b"refs/tags/") :].decode("utf-8", "surrogateescape")
+        # Prefer the peeled commit date (annotated tags), then the commit date
+        # (lightweight tags), then the creator date
+        for timestamp_str in parts[1:]:
+            if timestamp_str:
+                try:
+                    timestamps[tag] = int(timestamp_str)
+                    break
+                except ValueError:
+                    continue
+    return timestamps
+
+
 def find_earliest_tags_by_time(repo_path: str, tags: List[str], limit: int = 1) -> List[str]:
     """Find the earliest tags by creation time from a list of tags.
 
@@ -140,12 +494,18 @@ def find_earliest_tags_by_time(repo_path: str, tags: List[str], limit: int = 1)
     if not tags:
         return []
 
-    # Get timestamps for all tags
+    # Get timestamps for all tags, one git call per tag only if the batch call fails
+    all_timestamps = get_tag_timestamps(repo_path)
+    if all_timestamps is not None:
+        timestamps = [all_timestamps.get(tag) for tag in tags]
+    else:
+        with ThreadPoolExecutor(max_workers=MAX_GIT_WORKERS) as executor:
+            timestamps = list(executor.map(lambda t: get_tag_timestamp(repo_path, t), tags))
+
     tag_timestamps = []
     tags_without_timestamp = []
 
-    for tag in tags:
-        timestamp = get_tag_timestamp(repo_path, tag)
+    for tag, timestamp in zip(tags, timestamps):
         if timestamp is not None:
             tag_timestamps.append((tag, timestamp))
         else:
@@ -173,78 +533,97 @@ def find_earliest_tags_by_time(repo_path: str, tags: List[str], limit: int = 1)
     return result
 
 
-def find_earliest_tag_for_commit(repo: str, commit: str, limit: int = 1) -> Dict:
+def find_earliest_tag_for_commit(
+    repo: str, commit: str, limit: int = 1, refresh: bool = False
+) -> Dict:
     """Find the earliest tags (by creation time) that contain the given commit.
 
     Args:
         repo: Git repository URL or local directory path
         commit: Commit hash to find tags containing it
         limit: Maximum number of tags to return (default: 1)
+        refresh: Update the cached clone of a remote repository even if it is recent
 
     Returns:
         Dictionary with repo, commit, and tags (or earliest_tag for backward compatibility)
     """
-    temp_dir = None
     original_repo = repo
 
-    try:
-        # For remote repos, we need to clone first to check commits
-        if is_git_url(repo):
-            temp_dir = tempfile.mkdtemp()
-            # Shallow clone to save time and space
-            subprocess.run(
-                ["git", "clone", "--depth", "100", "--tags", repo, temp_dir],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=120,
-            )
-            repo = temp_dir
-        elif not is_local_directory(repo):
-            raise GitTagLookupError(
-                f"Invalid repository: {repo}. Must be a git URL or local directory."
-            )
+    # For remote repos, we need a local clone to check commits
+    updated = True
+    if is_git_url(repo):
+        repo, updated = get_cached_clone(repo, refresh)
+    elif not is_local_directory(repo):
+        raise GitTagLookupError(
+            f"Invalid repository: {repo}. Must be a git URL or local directory."
+        )
 
-        # Get all tags
-        tags = get_tags_from_local(repo)
-
-        if not tags:
-            return {
-                "repo": original_repo,
-                "commit": commit,
-                "earliest_tag": None,
-                "tags": [],
-                "error": "No tags found in repository",
-            }
-
-        # Filter tags that contain the commit
-        containing_tags = [tag for tag in tags if check_commit_in_tag_local(repo, commit, tag)]
-
-        if not containing_tags:
-            return {
-                "repo": original_repo,
-                "commit": commit,
-                "earliest_tag": None,
-                "tags": [],
-                "error": f"No tag contains commit {commit}",
-            }
-
-        # Find the earliest tags by creation time
-        earliest_tags = find_earliest_tags_by_time(repo, containing_tags, limit)
-
-        result = {"repo": original_repo, "commit": commit, "tags": earliest_tags}
-
-        # For backward compatibility, also include earliest_tag when limit is 1
-        if earliest_tags:
-            result["earliest_tag"] = earliest_tags[0]
-        else:
-            result["earliest_tag"] = None
+    result = _find_earliest_tag_for_commit_in(repo, original_repo, commit, limit)
+    stale_errors = (
+        f"Commit {commit} not found in repository",
+        f"No tag contains commit {commit}",
+    )
+    if not updated and result.get("error") in stale_errors:
+        # The cached clone was not fetched this run and may predate the commit or
+        # the tags containing it
+        repo, _ = get_cached_clone(original_repo, refresh=True)
+        result = _find_earliest_tag_for_commit_in(repo, original_repo, commit, limit)
+    return result
 
-        return result
-    finally:
-        # Clean up temporary directory
-        if temp_dir and os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
+
+def _find_earliest_tag_for_commit_in(
+    repo_path: str, original_repo: str, commit: str, limit: int
+) -> Dict:
+    """Look up the earliest tags containing a commit in a local repository or clone."""
+    # Resolve the commit once, so a bad hash fails before any tag is looked at and all
+    # later git calls get an unambiguous object name
+    commit_hash = resolve_commit(repo_path, commit)
+
+    if commit_hash is None:
+        return {
+            "repo": original_repo,
+            "commit": commit,
+            "earliest_tag": None,
+            "tags": [],
+            "error": f"Commit {commit} not found in repository",
+        }
+
+    # Get all tags
+    tags = get_tags_from_local(repo_path)
+
+    if not tags:
+        return {
+            "repo": original_repo,
+            "commit": commit,
+            "earliest_tag": None,
+            "tags": [],
+            "error": "No tags found in repository",
+        }
+
+    # Filter tags that contain the commit
+    containing_tags = get_tags_containing_commit(repo_path, commit_hash, tags)
+
+    if not containing_tags:
+        return {
+            "repo": original_repo,
+            "commit": commit,
+            "earliest_tag": None,
+            "tags": [],
+            "error": f"No tag contains commit {commit}",
+        }
+
+    # Find the earliest tags by creation time
+    earliest_tags = find_earliest_tags_by_time(repo_path, containing_tags, limit)
+
+    result = {"repo": original_repo, "commit": commit, "tags": earliest_tags}
+
+    # For backward compatibility, also include earliest_tag when limit is 1
+    if earliest_tags:
+        result["earliest_tag"] = earliest_tags[0]
+    else:
+        result["earliest_tag"] = None
+
+    return result
 
 
 def search_commits_by_keyword(repo: str, keyword: str, limit: Optional[int] = None) -> Dict:
@@ -262,45 +641,76 @@ def search_commits_by_keyword(repo: str, keyword: str, limit: Optional[int] = No
             f"Invalid repository: {repo}. Must be a git URL or local directory."
         )
 
-    # Build git log command
-    cmd = ["git", "log", "--grep", keyword, "--format=%H|%s|%an|%ai"]
+    # Build git log command. Fields are separated by the ASCII unit separator, which
+    # does not occur in commit data, and the subject comes last so that even a subject
+    # containing one cannot shift the other fields. Each record is a single line.
+    cmd = ["git", "log", "--grep", keyword, "--format=%H%x1f%an%x1f%ai%x1f%s"]
 
     if limit is not None:
         cmd.extend(["-n", str(limit)])
 
     try:
-        result = subprocess.run(
-            cmd, cwd=repo, capture_output=True, text=True, check=True, timeout=60
+        # Stream the output so records are parsed as git produces them, instead of
+        # buffering the whole log in memory first
+        proc = subprocess.Popen(
+            cmd,
+            cwd=repo,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
         )
+    except FileNotFoundError:
+        raise GitTagLookupError("git command not found. Please install git.")
+
+    timed_out = threading.Event()
+
+    def kill_on_timeout() -> None:
+        timed_out.set()
+        proc.kill()
 
-        commits: List[Dict] = []
-        all_lines: List[str] = [line for line in result.stdout.strip().split("\n") if line.strip()]
-        total_count = len(all_lines)
+    timer = threading.Timer(60, kill_on_timeout)
+    timer.start()
 
-        # Parse output (respect limit if specified)
-        for line in all_lines:
+    commits: List[Dict] = []
+    stopped_early = False
+    try:
+        assert proc.stdout is not None and proc.stderr is not None
+        # Parse output (respect limit if specified). git writes raw bytes, so decode each
+        # field as UTF-8 ourselves instead of trusting the locale encoding.
+        for line in proc.stdout:
             if limit is not None and len(commits) >= limit:
+                stopped_early = True
                 break
-            parts = line.split("|", 3)
-            if len(parts) >= 4:
-                commits.append(
-                    {"hash": parts[0], "message": parts[1], "author": parts[2], "date": parts[3]}
-                )
+            commit_hash, author, date, message = line.rstrip(b"\n").split(b"\x1f", 3)
+            commits.append(
+                {
+                    "hash": commit_hash.decode("ascii"),
+                    "message": message.decode("utf-8", "replace"),
+                    "author": author.decode("utf-8", "replace"),
+                    "date": date.decode("ascii"),
+                }
+            )
+        if stopped_early:
+            proc.kill()
+        stderr = proc.stderr.read().decode("utf-8", "replace")
+        proc.wait()
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        proc.stderr.close()
 
-        output = {"repo": repo, "keyword": keyword, "total": total_count, "commits": commits}
+    if timed_out.is_set():
+        raise GitTagLookupError(f"Timeout while searching commits in {repo}")
 
-        if limit is not None:
-            output["limit"] = limit
+    # git log exits with 0 when nothing matches, so a non-zero status is a real
+    # failure unless we stopped reading the output ourselves
+    if proc.returncode != 0 and not stopped_early:
+        if "fatal" in stderr.lower() or "error" in stderr.lower():
+            raise GitTagLookupError(f"Failed to search commits: {stderr}")
+        return {"repo": repo, "keyword": keyword, "total": 0, "commits": []}
 
-        return output
+    output = {"repo": repo, "keyword": keyword, "total": len(commits), "commits": commits}
 
-    except subprocess.TimeoutExpired:
-        raise GitTagLookupError(f"Timeout while searching commits in {repo}")
-    except subprocess.CalledProcessError as e:
-        # If no commits found, git log returns non-zero, but that's okay
-        if "fatal" in e.stderr.lower() or "error" in e.stderr.lower():
-            raise GitTagLookupError(f"Failed to search commits: {e.stderr}")
-        # Otherwise, return empty result
-        return {"repo": repo, "keyword": keyword, "total": 0, "commits": []}
-    except FileNotFoundError:
-        raise GitTagLookupError("git command not found. Please install git.")
+    if limit is not None:
+        output["limit"] = limit
+
+    return output
@@ -1,30 +1,47 @@
 """Utility functions for git-tag-lookup."""
 
+import functools
 import json
 import os
 import re
-from typing import List, Optional, Tuple
+from typing import Any, List, Optional, TextIO, Tuple
 
 from packaging import version
 
+# Prefixes that identify a repository argument as a git URL
+_GIT_URL_PREFIXES = ("http://", "https://", "git@", "git://", "ssh://")
+
+# Prefixes stripped from tag names before parsing them as versions
+_VERSION_PREFIXES = (
+    "v",
+    "V",
+    "release-",
+    "Release-",
+    "RELEASE-",
+    "version-",
+    "Version-",
+    "VERSION-",
+)
+
+# Match patterns like: 1.2.3, 1.2.3.4, 1.2.3-beta, 1.2.3a1, etc. Only the numeric
+# part is captured: a plain N.N[.N[.N]] always parses, so it takes precedence over
+# any suffix.
+_VERSION_RE = re.compile(r"\d+\.\d+(?:\.\d+){0,2}")
+
+# Encoder for CLI output, and how many encoded pieces are joined per write
+_JSON_ENCODER = json.JSONEncoder(indent=2, ensure_ascii=False)
+_JSON_WRITE_BATCH = 8192
+
 
 def is_git_url(repo: str) -> bool:
     """Check if the given string is a git URL."""
-    git_url_patterns = [
-        r"^https?://",
-        r"^git@",
-        r"^git://",
-        r"^ssh://",
-    ]
-    return any(re.match(pattern, repo) for pattern in git_url_patterns)
+    return repo.startswith(_GIT_URL_PREFIXES)
 
 
 def is_local_directory(path: str) -> bool:
     """Check if the given path is a valid local git directory."""
-    if not os.path.exists(path):
-        return False
-    git_dir = os.path.join(path, ".git")
-    return os.path.exists(git_dir) and os.path.isdir(git_dir)
+    # isdir is False for missing paths, so a single stat covers both checks
+    return os.path.isdir(os.path.join(path, ".git"))
 
 
 def normalize_tag_name(tag: str) -> str:
@@ -33,6 +50,7 @@ def normalize_tag_name(tag: str) -> str:
     return tag.replace("refs/tags/", "")
 
 
+@functools.lru_cache(maxsize=4096)
 def parse_version(tag: str) -> Optional[version.Version]:
     """Parse version from tag name, return None if not a valid version.
 
@@ -40,7 +58,13 @@ def parse_version(tag: str) -> Optional[version.Version]:
     1. Try to parse the tag directly
     2. Try removing common prefixes (v, V, release-, etc.)
     3. Try extracting version pattern from anywhere in the tag
+
+    Results are cached, since the same tags are parsed repeatedly.
     """
+    # Every strategy needs at least one digit, skip the parsing attempts otherwise
+    if not any(c.isdigit() for c in tag):
+        return None
+
     # Strategy 1: Try parsing the tag directly
     try:
         return version.parse(tag)
@@ -49,8 +73,7 @@ def parse_version(tag: str) -> Optional[version.Version]:
 
     # Strategy 2: Try removing common prefixes
     normalized = normalize_tag_name(tag)
-    prefixes = ["v", "V", "release-", "Release-", "RELEASE-", "version-", "Version-", "VERSION-"]
-    for prefix in prefixes:
+    for prefix in _VERSION_PREFIXES:
         if normalized.startswith(prefix):
             try:
                 return version.parse(normalized[len(prefix) :])
@@ -58,37 +81,53 @@ def parse_version(tag: str) -> Optional[version.Version]:
                 continue
 
     # Strategy 3: Try to extract version pattern from anywhere in the tag
-    # Match patterns like: 1.2.3, 1.2.3.4, 1.2.3-beta, etc.
-    version_patterns = [
-        r"(\d+\.\d+(?:\.\d+)?(?:\.\d+)?)",  # Standard version: 1.2.3 or 1.2.3.4
-        r"(\d+\.\d+(?:\.\d+)?(?:\.\d+)?[-_][a-zA-Z0-9]+)",  # With suffix: 1.2.3-beta
-        r"(\d+\.\d+(?:\.\d+)?(?:\.\d+)?[a-zA-Z]\d*)",  # With letter: 1.2.3a1
-    ]
-
-    for pattern in version_patterns:
-        match = re.search(pattern, normalized)
-        if match:
-            try:
-                return version.parse(match.group(1))
-            except (version.InvalidVersion, AttributeError):
-                continue
+    match = _VERSION_RE.search(normalized)
+    if match:
+        try:
+            return version.parse(match.group(0))
+        except (version.InvalidVersion, AttributeError):
+            pass
 
     return None
 
 
-def sort_tags_by_version(tags: List[str]) -> List[Tuple[str, version.Version]]:
-    """Sort tags by version number, return list of (tag, version) tuples.
+def _version_sort_key(v: version.Version) -> Any:
+    """Return a key that orders like the version itself.
 
-    Only returns tags that can be parsed as versions.
+    packaging precomputes a comparison tuple for every Version; sorting on it avoids a
+    Python-level Version.__lt__ call per comparison. Falls back to the Version if the
+    private attribute is not available.
+    """
+    return getattr(v, "_key", v)
+
+
+def partition_tags_by_version(
+    tags: List[str],
+) -> Tuple[List[Tuple[str, version.Version]], List[str]]:
+    """Split tags into (tag, version) tuples and tags that are not versions.
+
+    Each tag is parsed once. Both lists keep the input order.
     """
-    tag_versions = []
+    version_tags = []
+    non_version_tags = []
     for tag in tags:
         v = parse_version(tag)
         if v is not None:
-            tag_versions.append((tag, v))
+            version_tags.append((tag, v))
+        else:
+            non_version_tags.append(tag)
+    return version_tags, non_version_tags
+
+
+def sort_tags_by_version(tags: List[str]) -> List[Tuple[str, version.Version]]:
+    """Sort tags by version number, return list of (tag, version) tuples.
+
+    Only returns tags that can be parsed as versions.
+    """
+    tag_versions, _ = partition_tags_by_version(tags)
 
     # Sort by version
-    tag_versions.sort(key=lambda x: x[1])
+    tag_versions.sort(key=lambda x: _version_sort_key(x[1]))
     return tag_versions
 
 
@@ -105,17 +144,15 @@ def find_earliest_tag(tags: List[str]) -> Optional[str]:
         return None
 
     # Separate tags into version-parsable and non-parsable
-    version_tags = sort_tags_by_version(tags)
-    non_version_tags = [tag for tag in tags if parse_version(tag) is None]
+    version_tags, non_version_tags = partition_tags_by_version(tags)
 
     # If we have version-parsable tags, return the earliest one
     if version_tags:
-        return version_tags[0][0]
+        return min(version_tags, key=lambda x: _version_sort_key(x[1]))[0]
 
     # Otherwise, return the alphabetically first non-version tag
     if non_version_tags:
-        non_version_tags.sort()
-        return non_version_tags[0]
+        return min(non_version_tags)
 
     return None
 
@@ -125,6 +162,40 @@ def format_json_output(data: dict) -> str:
     return json.dumps(data, indent=2, ensure_ascii=False)
 
 
+def write_json_output(data: dict, fp: TextIO) -> None:
+    """Write data as indented JSON to a file object, followed by a newline.
+
+    Same output as format_json_output, but streamed to fp in batches instead of
+    building the whole string in memory first. If fp wraps a binary buffer, like
+    sys.stdout, the JSON goes straight to the buffer as UTF-8, regardless of the
+    locale encoding.
+    """
+    buffer = getattr(fp, "buffer", None)
+    if buffer is not None:
+        # Keep anything already written through the text layer in order
+        fp.flush()
+
+    def write(text: str) -> None:
+        if buffer is not None:
+            # surrogateescape writes tag names that were not valid UTF-8 back as their
+            # original bytes
+            buffer.write(text.encode("utf-8", "surrogateescape"))
+        else:
+            fp.write(text)
+
+    chunks: List[str] = []
+    for chunk in _JSON_ENCODER.iterencode(data):
+        chunks.append(chunk)
+        if len(chunks) >= _JSON_WRITE_BATCH:
+            write("".join(chunks))
+            chunks.clear()
+    chunks.append("\n")
+    write("".join(chunks))
+
+    if buffer is not None:
+        buffer.flush()
+
+
 def escape_json_string(s: str) -> str:
     """Escape string for JSON output."""
     return json.dumps(s)